@@ -1,13 +1,29 @@
 import re
 import os
 import json
+import math
+from enum import IntEnum
+from functools import lru_cache
 from typing import Tuple, Dict, List
+import httpx
+from cachetools import LRUCache
 from dotenv import load_dotenv
-from groq import Groq
+from groq import AsyncGroq
 
 load_dotenv()
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+# One pooled client per process; a slow Groq call fails fast into the
+# fallback reply instead of stalling the worker.
+LLM_TIMEOUT = 2.0
+
+client = AsyncGroq(
+    api_key=os.getenv("GROQ_API_KEY"),
+    timeout=LLM_TIMEOUT,
+    max_retries=0,
+    http_client=httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    )
+)
 
 DATA_FILE = "data.json"
 
@@ -24,22 +40,52 @@ try:
 except:
     _conversation_entities = {}
 
-_conversation_states = {}
-_conversation_history = {}
+# Bounded so per-conversation memory does not grow with every id ever seen;
+# the least recently active conversations are evicted first.
+MAX_CONVERSATIONS = 100_000
+
+_conversation_history = LRUCache(maxsize=MAX_CONVERSATIONS)
+
+# Persona states are split across independent shards so each map stays
+# small and evicts/rehashes cheaply. Each shard gets 2x its even share so
+# hash skew never evicts a state while the conversation's history is kept.
+_STATE_SHARDS = 16
+_STATE_SHARD_SIZE = math.ceil(MAX_CONVERSATIONS / _STATE_SHARDS) * 2
+_state_shards = [
+    LRUCache(maxsize=_STATE_SHARD_SIZE) for _ in range(_STATE_SHARDS)
+]
 
 # -----------------------------
 # Scam detection keywords
 # -----------------------------
-SCAM_KEYWORDS = [
+SCAM_KEYWORDS = (
     "account", "blocked", "suspended", "verify",
     "fraud", "security", "alert", "urgent",
     "lottery", "winner", "won", "prize",
     "selected", "congratulations", "reward"
-]
-
-URGENCY_KEYWORDS = ["urgent", "immediately", "now", "asap"]
-PAYMENT_KEYWORDS = ["pay", "payment", "transfer", "upi", "bank"]
-NEGATIONS = ["not", "no", "never"]
+)
+
+URGENCY_KEYWORDS = ("urgent", "immediately", "now", "asap")
+PAYMENT_KEYWORDS = ("pay", "payment", "transfer", "upi", "bank")
+NEGATIONS = ("not", "no", "never")
+
+# One word-bounded alternation over every keyword list, so a message is
+# scanned once instead of once per keyword.
+_KEYWORD_CATEGORIES: Dict[str, Tuple[str, ...]] = {}
+for _category, _words in (
+    ("scam", SCAM_KEYWORDS),
+    ("urgency", URGENCY_KEYWORDS),
+    ("payment", PAYMENT_KEYWORDS),
+    ("negation", NEGATIONS),
+):
+    for _word in _words:
+        _KEYWORD_CATEGORIES[_word] = _KEYWORD_CATEGORIES.get(_word, ()) + (_category,)
+
+_KEYWORD_RE = re.compile(
+    r"\b(?:" + "|".join(
+        re.escape(w) for w in sorted(_KEYWORD_CATEGORIES, key=len, reverse=True)
+    ) + r")\b"
+)
 
 # -----------------------------
 # Regex patterns (UPDATED)
@@ -49,13 +95,16 @@ BANK_ACCOUNT_PATTERN = r"\b\d{9,18}\b"
 IFSC_PATTERN = r"\b[A-Z]{4}0[A-Z0-9]{6}\b"
 URL_PATTERN = r"https?://\S+|www\.\S+"
 
+_UPI_RE = re.compile(UPI_PATTERN)
+_BANK_RE = re.compile(BANK_ACCOUNT_PATTERN)
+_IFSC_RE = re.compile(IFSC_PATTERN)
+_URL_RE = re.compile(URL_PATTERN)
+_SEPARATOR_RE = re.compile(r"[,\n;]")
+
 # -----------------------------
 # Ensure clean conversation
 # -----------------------------
 def initialize_conversation(conversation_id: str):
-    if conversation_id not in _conversation_states:
-        _conversation_states[conversation_id] = "idle"
-
     if conversation_id not in _conversation_history:
         _conversation_history[conversation_id] = []
 
@@ -67,6 +116,37 @@ def initialize_conversation(conversation_id: str):
             "phishing_links": set()
         }
 
+# -----------------------------
+# Persona state
+# -----------------------------
+class PersonaState(IntEnum):
+    IDLE = 0
+    CONFUSED = 1
+    EXTRACTING = 2
+
+# public names used in API replies, indexed by state
+_STATE_NAMES = ("idle", "confused", "extracting")
+
+# next state, indexed by current state
+_TRANSITIONS = (
+    PersonaState.CONFUSED,
+    PersonaState.EXTRACTING,
+    PersonaState.EXTRACTING,
+)
+
+def _state_shard(conversation_id: str) -> int:
+    return hash(conversation_id) & (_STATE_SHARDS - 1)
+
+def get_persona_state(conversation_id: str) -> PersonaState:
+    shard = _state_shards[_state_shard(conversation_id)]
+    return shard.get(conversation_id, PersonaState.IDLE)
+
+def update_persona_state(conversation_id: str, state: PersonaState):
+    _state_shards[_state_shard(conversation_id)][conversation_id] = state
+
+def determine_next_state(current_state: PersonaState) -> PersonaState:
+    return _TRANSITIONS[current_state]
+
 # -----------------------------
 # Save data
 # -----------------------------
@@ -78,83 +158,135 @@ def save_data():
         )
 
 # -----------------------------
-# Scam Detection
+# Scam Detection + Entity Extraction
 # -----------------------------
-def detect_scam(message: str) -> Tuple[bool, float]:
-    if not isinstance(message, str) or not message.strip():
-        return False, 0.0
+def _keyword_hits(msg: str) -> Dict[str, int]:
+    # count each distinct keyword once per category
+    hits = {"scam": 0, "urgency": 0, "payment": 0, "negation": 0}
+    for word in set(_KEYWORD_RE.findall(msg)):
+        for category in _KEYWORD_CATEGORIES[word]:
+            hits[category] += 1
+    return hits
+
+def _analyze(message: str) -> Tuple[bool, float, Tuple[Tuple[str, ...], ...]]:
+    # normalize input once for both detection and extraction;
+    # already-lowercase text (common for scam templates) is not copied
+    if message.isascii() and message.islower():
+        msg = message
+    else:
+        msg = message.lower()
+    msg = _SEPARATOR_RE.sub(" ", msg)
+
+    upi_ids = set(_UPI_RE.findall(msg))
+    # bank numbers are matched on the lowercased text and IFSC codes on the
+    # uppercased text; case mapping can move Unicode word boundaries, so the
+    # two cannot share one pass over either string
+    bank_accounts = set(_BANK_RE.findall(msg))
+    ifsc_codes = set(_IFSC_RE.findall(msg.upper()))
+    phishing_links = set(_URL_RE.findall(msg))
 
-    msg = message.lower()
     score = 0.0
 
-    keyword_hits = sum(0.15 for w in SCAM_KEYWORDS if re.search(rf"\b{w}\b", msg))
-    score += min(0.5, keyword_hits)
+    hits = _keyword_hits(msg)
 
-    score += 0.2 if any(re.search(rf"\b{w}\b", msg) for w in URGENCY_KEYWORDS) else 0.0
-    score += 0.2 if any(re.search(rf"\b{w}\b", msg) for w in PAYMENT_KEYWORDS) else 0.0
+    score += min(0.5, 0.15 * hits["scam"])
 
-    score += 0.2 if re.search(URL_PATTERN, msg) else 0.0
-    score += 0.3 if re.search(UPI_PATTERN, msg) else 0.0
-    score += 0.3 if re.search(BANK_ACCOUNT_PATTERN, msg) else 0.0
+    score += 0.2 if hits["urgency"] else 0.0
+    score += 0.2 if hits["payment"] else 0.0
 
-    if any(re.search(rf"\b{neg}\b", msg) for neg in NEGATIONS):
+    score += 0.2 if phishing_links else 0.0
+    score += 0.3 if upi_ids else 0.0
+    score += 0.3 if bank_accounts else 0.0
+
+    if hits["negation"]:
         score *= 0.7
 
     confidence = min(round(score, 2), 1.0)
-    return confidence >= 0.6, confidence
 
-# -----------------------------
-# Entity Extraction (FIXED)
-# -----------------------------
-def extract_entities(message: str) -> Dict[str, List[str]]:
-    # normalize input
-    message = message.lower()
-    message = re.sub(r"[,\n;]", " ", message)
-
-    upi_ids = set(re.findall(UPI_PATTERN, message))
-    bank_accounts = set(re.findall(BANK_ACCOUNT_PATTERN, message))
-    ifsc_codes = set(re.findall(IFSC_PATTERN, message.upper()))
-    phishing_links = set(re.findall(URL_PATTERN, message))
-
-    # remove overlap
-    bank_accounts = {
-        acc for acc in bank_accounts
-        if not any(acc in upi for upi in upi_ids)
-    }
+    # remove overlap; one C-level substring test per account instead of
+    # a Python-level any() over every UPI id (digits never span the spaces)
+    upi_text = " ".join(upi_ids)
+    bank_accounts = {acc for acc in bank_accounts if acc not in upi_text}
+
+    return confidence >= 0.6, confidence, (
+        tuple(upi_ids),
+        tuple(bank_accounts),
+        tuple(ifsc_codes),
+        tuple(phishing_links)
+    )
+
+# Repeated short messages (greetings, rebroadcast templates) skip the scan;
+# long ones bypass the cache so a single sender cannot flush it.
+_analyze_cached = lru_cache(maxsize=4096)(_analyze)
+ANALYZE_CACHE_MAX_LEN = 512
+
+# nothing shorter can score: the shortest scoring keywords ("now", "pay")
+# and the shortest UPI id ("a@b") are 3 chars
+MIN_MESSAGE_LEN = 3
+
+def analyze(message: str) -> Tuple[bool, float, Dict[str, List[str]]]:
+    if (
+        not isinstance(message, str)
+        or len(message) < MIN_MESSAGE_LEN
+        or not message.strip()
+    ):
+        return False, 0.0, {
+            "upi_ids": [],
+            "bank_accounts": [],
+            "ifsc_codes": [],
+            "phishing_links": []
+        }
 
-    return {
+    if len(message) > ANALYZE_CACHE_MAX_LEN:
+        result = _analyze(message)
+    else:
+        result = _analyze_cached(message)
+
+    is_scam, confidence, (upi_ids, bank_accounts, ifsc_codes, phishing_links) = result
+
+    return is_scam, confidence, {
         "upi_ids": list(upi_ids),
         "bank_accounts": list(bank_accounts),
         "ifsc_codes": list(ifsc_codes),
         "phishing_links": list(phishing_links)
     }
 
+def detect_scam(message: str) -> Tuple[bool, float]:
+    is_scam, confidence, _ = analyze(message)
+    return is_scam, confidence
+
+def extract_entities(message: str) -> Dict[str, List[str]]:
+    return analyze(message)[2]
+
 # -----------------------------
 # LLM REPLY
 # -----------------------------
-def generate_llm_reply(conversation_id: str) -> str:
-    try:
-        history = _conversation_history.get(conversation_id, [])
-
-        system_prompt = {
-            "role": "system",
-            "content": """
+SYSTEM_PROMPT = {
+    "role": "system",
+    "content": """
 You are a normal, slightly naive person talking to a scammer.
 Keep replies short, curious, and natural.
 Do not act suspicious.
 """
-        }
+}
+
+FALLBACK_REPLY = "Hmm okay… what should I do next?"
+
+async def generate_llm_reply(conversation_id: str) -> str:
+    try:
+        history = _conversation_history.get(conversation_id, [])
 
-        messages = [system_prompt] + history
+        messages = [SYSTEM_PROMPT] + history
 
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="llama-3.1-8b-instant",
             messages=messages
         )
 
         reply = response.choices[0].message.content.strip()
 
-        _conversation_history[conversation_id].append({
+        # the conversation may have been evicted while awaiting the reply
+        _conversation_history.setdefault(conversation_id, []).append({
             "role": "assistant",
             "content": reply
         })
@@ -163,33 +295,32 @@ Do not act suspicious.
 
     except Exception as e:
         print("Groq error:", e)
-        return "Hmm okay… what should I do next?"
+        return FALLBACK_REPLY
 
 # -----------------------------
 # Honeypot Engine
 # -----------------------------
-def honeypot_response(conversation_id: str, message: str) -> dict:
+async def honeypot_response(conversation_id: str, message: str) -> dict:
 
     initialize_conversation(conversation_id)
 
-    current_state = _conversation_states[conversation_id]
-    next_state = "confused" if current_state == "idle" else "extracting"
-    _conversation_states[conversation_id] = next_state
+    # no await between read and write, so the event loop keeps this atomic
+    next_state = determine_next_state(get_persona_state(conversation_id))
+    update_persona_state(conversation_id, next_state)
 
     _conversation_history[conversation_id].append({
         "role": "user",
         "content": message
     })
 
-    is_scam, confidence = detect_scam(message)
-    entities = extract_entities(message)
+    is_scam, confidence, entities = analyze(message)
 
     for key in ["upi_ids", "bank_accounts", "ifsc_codes", "phishing_links"]:
         _conversation_entities[conversation_id][key].update(entities.get(key, []))
 
     save_data()
 
-    reply = generate_llm_reply(conversation_id)
+    reply = await generate_llm_reply(conversation_id)
 
     stored = {
         k: list(v) for k, v in _conversation_entities[conversation_id].items()
@@ -198,7 +329,7 @@ def honeypot_response(conversation_id: str, message: str) -> dict:
     return {
         "is_scam": is_scam,
         "confidence": confidence,
-        "persona_state": next_state,
+        "persona_state": _STATE_NAMES[next_state],
         "reply": reply,
         "extracted_entities": stored
     }
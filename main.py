@@ -1,4 +1,5 @@
 import logging
+import orjson
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -11,10 +12,16 @@ except Exception as e:
     print("❌ Logic import failed:", e)
     logic = None
 
+# orjson encodes in Rust; FastAPI's bundled ORJSONResponse is deprecated,
+# so render with orjson directly.
+class ORJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Honeypot API")
+app = FastAPI(title="Honeypot API", default_response_class=ORJSONResponse)
 
 # -------------------------------------------------
 # 🔥 CORS FIX (IMPORTANT)
@@ -32,11 +39,13 @@ app.add_middleware(
 # -------------------------------------------------
 # Helper response
 # -------------------------------------------------
+# Handlers return ready-made responses: the payloads are plain JSON types we
+# build ourselves, so FastAPI's jsonable_encoder pass over them is skipped.
 def evaluator_response(reply: str):
-    return {
+    return ORJSONResponse(content={
         "status": "success",
         "reply": reply
-    }
+    })
 
 # -------------------------------------------------
 # Root & Health
@@ -56,21 +65,30 @@ def health():
 async def honeypot_handler(request: Request):
     try:
         data = await request.json()
+    except ValueError as e:
+        logger.error(f"Error in /api/honeypot: {e}")
+        return evaluator_response("Error")
 
-        text = str(data.get("message", "")).strip()
+    if not isinstance(data, dict):
+        logger.error("Error in /api/honeypot: request body is not a JSON object")
+        return evaluator_response("Error")
 
-        if not text:
-            return evaluator_response("Invalid input")
+    text = str(data.get("message", "")).strip()
 
-        if logic:
-            return evaluator_response(logic.generate_agent_reply(text))
+    if not text:
+        return evaluator_response("Invalid input")
 
+    if not logic:
         return evaluator_response("Logic not available")
 
+    try:
+        reply = logic.generate_agent_reply(text)
     except Exception as e:
         logger.error(f"Error in /api/honeypot: {e}")
         return evaluator_response("Error")
 
+    return evaluator_response(reply)
+
 # -------------------------------------------------
 # 🔥 Full honeypot endpoint
 # -------------------------------------------------
@@ -78,27 +96,36 @@ async def honeypot_handler(request: Request):
 async def honeypot_full(request: Request):
     try:
         data = await request.json()
+    except ValueError as e:
+        logger.error(f"Error in /api/full: {e}")
+        return evaluator_response("Error")
 
-        # ✅ SAFE extraction
-        conversation_id = str(data.get("conversation_id", "")).strip()
-        text = str(data.get("message", "")).strip()
+    if not isinstance(data, dict):
+        logger.error("Error in /api/full: request body is not a JSON object")
+        return evaluator_response("Error")
 
-        # 🔥 REQUIRED FIX: ensure stable ID
-        if not conversation_id:
-            conversation_id = "default"
+    # ✅ SAFE extraction
+    conversation_id = str(data.get("conversation_id", "")).strip()
+    text = str(data.get("message", "")).strip()
 
-        if not text:
-            return evaluator_response("Invalid input")
+    # 🔥 REQUIRED FIX: ensure stable ID
+    if not conversation_id:
+        conversation_id = "default"
 
-        if logic:
-            return logic.honeypot_response(conversation_id, text)
+    if not text:
+        return evaluator_response("Invalid input")
 
+    if not logic:
         return evaluator_response("Logic not available")
 
+    try:
+        result = await logic.honeypot_response(conversation_id, text)
     except Exception as e:
         logger.error(f"Error in /api/full: {e}")
         return evaluator_response("Error")
 
+    return ORJSONResponse(content=result)
+
 # -------------------------------------------------
 # Data retrieval endpoint
 # -------------------------------------------------
@@ -108,16 +135,16 @@ async def get_data(conversation_id: str):
         conversation_id = str(conversation_id).strip()
 
         if logic:
-            return {
+            return ORJSONResponse(content={
                 "conversation_id": conversation_id,
                 "collected_data": logic.get_conversation_data(conversation_id)
-            }
+            })
 
-        return {"error": "Logic not available"}
+        return ORJSONResponse(content={"error": "Logic not available"})
 
     except Exception as e:
         logger.error(f"Error in /api/data: {e}")
-        return {"error": "Something went wrong"}
+        return ORJSONResponse(content={"error": "Something went wrong"})
 
 # -------------------------------------------------
 # Global fallback
@@ -125,7 +152,4 @@ async def get_data(conversation_id: str):
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global exception: {exc}")
-    return JSONResponse(
-        status_code=200,
-        content=evaluator_response("Error")
-    )
+    return evaluator_response("Error")
@@ -1,5 +1,11 @@
+import os
+
+# logic builds its Groq client at import time
+os.environ.setdefault("GROQ_API_KEY", "test")
+
 from fastapi.testclient import TestClient
 from main import app
+import logic
 
 client = TestClient(app)
 
@@ -52,6 +58,63 @@ def test_robustness():
     assert data["status"] == "success"
 
 
+def test_analyze_upi_hides_embedded_account():
+    is_scam, confidence, entities = logic.analyze("urgent pay 9876543210@ybl")
+
+    assert (is_scam, confidence) == (True, 1.0)
+    assert entities["upi_ids"] == ["9876543210@ybl"]
+    assert entities["bank_accounts"] == []
+
+
+def test_analyze_lowercase_ifsc():
+    is_scam, confidence, entities = logic.analyze("verify ifsc sbin0001234 account 123456789")
+
+    assert (is_scam, confidence) == (True, 0.6)
+    assert entities["ifsc_codes"] == ["SBIN0001234"]
+    assert entities["bank_accounts"] == ["123456789"]
+
+
+def test_analyze_url():
+    is_scam, confidence, entities = logic.analyze("blocked! verify at https://bit.ly/x now")
+
+    assert (is_scam, confidence) == (True, 0.7)
+    assert entities["phishing_links"] == ["https://bit.ly/x"]
+
+
+def test_analyze_negation():
+    is_scam, confidence, _ = logic.analyze("this is not a lottery, no prize")
+
+    assert (is_scam, confidence) == (False, 0.21)
+
+
+def test_analyze_short_message():
+    for msg in ["", "hi", "no"]:
+        is_scam, confidence, entities = logic.analyze(msg)
+
+        assert (is_scam, confidence) == (False, 0.0)
+        assert all(not v for v in entities.values())
+
+
+def test_devanagari_digit_account():
+    is_scam, confidence, entities = logic.analyze("भेजें खाता संख्या १२३४५६७८९०१२ urgent")
+
+    assert (is_scam, confidence) == (True, 0.65)
+    assert entities["bank_accounts"] == ["१२३४५६७८९०१२"]
+
+
+def test_digits_joined_to_unicode_word():
+    is_scam, confidence, entities = logic.analyze("transfer to café9876543210")
+
+    assert (is_scam, confidence) == (False, 0.2)
+    assert entities["bank_accounts"] == []
+
+
+def test_digits_after_case_changing_letter():
+    _, _, entities = logic.analyze("transfer to ǰ1234567890")
+
+    assert entities["bank_accounts"] == []
+
+
 def run_tests():
     print("Running tests...")
     try:
@@ -69,6 +132,18 @@ def run_tests():
         
         test_robustness()
         print("Robustness test passed.")
+
+        test_analyze_upi_hides_embedded_account()
+        test_analyze_lowercase_ifsc()
+        test_analyze_url()
+        test_analyze_negation()
+        test_analyze_short_message()
+        print("Analyze tests passed.")
+
+        test_devanagari_digit_account()
+        test_digits_joined_to_unicode_word()
+        test_digits_after_case_changing_letter()
+        print("Unicode tests passed.")
         
         print("ALL TESTS PASSED.")
     except AssertionError as e: